@@ -1,3 +1,3 @@
-from .llm_service import RAGService, rag_service
+from .llm_service import RAGService, get_rag_service
 
-__all__ = ['RAGService', 'rag_service']
\ No newline at end of file
+__all__ = ['RAGService', 'get_rag_service']
\ No newline at end of file
@@ -1,25 +1,341 @@
 # backend/llm_service.py
 import os
+import asyncio
+import functools
+import logging
 import time
-import json
+import orjson
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import torch
 from dotenv import load_dotenv
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import SentenceTransformerEmbeddings
+import chromadb
+from chromadb.config import Settings
+from langchain_core.embeddings import Embeddings
+from sentence_transformers import CrossEncoder, SentenceTransformer
 from langchain_google_genai import ChatGoogleGenerativeAI 
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema.output_parser import StrOutputParser
-import sqlite_utils
-from typing import List, Dict, Optional
+from langchain_core.messages import HumanMessage
+from typing import Dict, Iterator, List, Optional, Tuple
 from langchain.schema.document import Document
 import re
 
+try:
+    from .query_cache import PersistentSemanticCache, QueryCache, SemanticCache
+except ImportError:  # Loaded as a top-level module (backend/ on sys.path)
+    from query_cache import PersistentSemanticCache, QueryCache, SemanticCache
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Configuration
 CHROMA_DB_DIR = 'data/chroma_db'
+CHROMA_COLLECTION_NAME = "langchain"  # Collection written by function/indexing.py
+CONTENT_HASH_KEY = "content_hash"  # Per-document text digest stored in the metadata by function/indexing.py
 SQLITE_DB_PATH = 'data/people.sqlite'
 EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
 TOP_K_DOCUMENTS = 20  # Increased to get more candidates before filtering
+# Optional INT8 ONNX export of the embedding model for faster CPU queries. When optimum[onnxruntime]
+# is installed it is exported and quantized automatically on first start; or build it by hand:
+#   optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 --task feature-extraction onnx_minilm/
+#   optimum-cli onnxruntime optimize --onnx_model onnx_minilm -O2 -o onnx_minilm_opt/
+#   optimum-cli onnxruntime quantize --onnx_model onnx_minilm_opt --avx512_vnni -o data/onnx_minilm_q8
+#   mv data/onnx_minilm_q8/model_optimized_quantized.onnx data/onnx_minilm_q8/model_quantized.onnx
+# An existing export is reused as-is; delete the directory to rebuild it with the current pipeline.
+# Local cross-encoder that re-ranks retrieved candidates, so Gemini only explains the final few
+RERANKER_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+USE_RERANKER = os.getenv("USE_RERANKER", "1") == "1"
+ONNX_MODEL_DIR = os.getenv("ONNX_EMBEDDING_MODEL_DIR", "data/onnx_minilm_q8")
+ONNX_MODEL_FILE = "model_quantized.onnx"  # File name of the quantized model inside ONNX_MODEL_DIR
+# Search queries are short; capping them keeps attention cost flat for the occasional long paste
+QUERY_MAX_TOKENS = 64
+# Dynamic INT8 quantization of the encoder's Linear layers on CPU (~2x faster, <1% cosine drift)
+QUANTIZE_QUERY_ENCODER = os.getenv("QUANTIZE_QUERY_ENCODER", "1") == "1"
+
+# One read-only SQLite connection per thread (Streamlit/FastAPI serve from worker threads)
+_thread_local = threading.local()
+# Runs the SQLite record prefetch for sync search() while the calling thread waits on Gemini
+_prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="record-prefetch")
+
+MAX_MATCHES = 5
+LLM_CONTEXT_DOCUMENTS = 10  # Pass a smaller, highly relevant set to LLM
+LLM_CONTEXT_CHARS_PER_DOC = 400
+LLM_MAX_OUTPUT_TOKENS = 1024
+# Client-side throttle on Gemini requests, kept under the key's quota so bursts queue briefly
+# instead of triggering 429s and the client's retry backoff; 0 (or less) disables the limiter
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+LLM_BURST_REQUESTS = 10
+# Google API keys are "AIza" followed by 35 URL-safe characters
+GEMINI_API_KEY_PATTERN = re.compile(r"AIza[0-9A-Za-z_\-]{35}")
+GEMINI_API_KEY_PLACEHOLDER = "your_gemini_api_key_here"  # Written by setup_streamlit.py's secrets template
+
+# Retrieval results keyed by (normalized query, Chroma where filter)
+RETRIEVAL_CACHE_SIZE = 512
+RETRIEVAL_CACHE_TTL_SECONDS = 300
+# Full SQLite records keyed by id (the DB is read-only at serve time; the TTL bounds staleness
+# after a re-index)
+RECORD_CACHE_SIZE = 2048
+# LLM rankings reused for paraphrased queries over the same candidate set
+LLM_CACHE_SIZE = 256
+LLM_CACHE_SIMILARITY = 0.95
+# The LLM cache is also written to SQLite so it survives restarts and is shared across workers;
+# set LLM_CACHE_DB_PATH to an empty string to keep it in memory only
+LLM_CACHE_DB_PATH = os.getenv("LLM_CACHE_DB_PATH", "data/llm_cache.sqlite")
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+LLM_CACHE_MAX_ROWS = 10000  # Newest rows kept in the on-disk LLM cache
+
+
+class _SentenceTransformerEmbedder(Embeddings):
+    """Thin LangChain adapter that calls SentenceTransformer.encode directly, configured like indexing.py.
+
+    Vectors are L2-normalized here in FP32 rather than inside the model, so an FP16 (CUDA) model
+    never divides by a norm that has underflowed.
+    """
+
+    def __init__(self, model: SentenceTransformer):
+        self.model = model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with torch.inference_mode():
+            vectors = self.model.encode(texts, batch_size=64, convert_to_numpy=True).astype(np.float32)
+        vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-6, None)
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class _OnnxEmbedder(Embeddings):
+    """LangChain adapter over a quantized ONNX Runtime export (mean pooling + L2 norm, like the ST model)."""
+
+    def __init__(self, model_dir: str):
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = os.cpu_count() or 1
+        self.tokenizer = AutoTokenizer.from_pretrained(f"sentence-transformers/{EMBEDDING_MODEL_NAME}")
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_dir, file_name=ONNX_MODEL_FILE, session_options=session_options
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        inputs = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=QUERY_MAX_TOKENS, return_tensors="np"
+        )
+        hidden = np.asarray(self.model(**inputs).last_hidden_state)
+        mask = inputs["attention_mask"][..., None].astype(hidden.dtype)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def _export_quantized_onnx(model_dir: str):
+    """Export the embedding model to ONNX, fuse it, and apply dynamic INT8 (AVX512-VNNI) quantization once."""
+    import tempfile
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTOptimizer, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig, OptimizationConfig
+
+    logger.info(f"Exporting quantized ONNX embedding model to {model_dir}...")
+    onnx_model = ORTModelForFeatureExtraction.from_pretrained(
+        f"sentence-transformers/{EMBEDDING_MODEL_NAME}", export=True, provider="CPUExecutionProvider"
+    )
+    # Build next to model_dir and rename it into place at the end, so concurrent workers never
+    # load a half-written export
+    parent_dir = os.path.dirname(os.path.abspath(model_dir))
+    os.makedirs(parent_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=parent_dir) as work_dir:
+        optimized_dir = os.path.join(work_dir, "optimized")
+        quantized_dir = os.path.join(work_dir, "quantized")
+        # Level 2 fuses attention, GELU and LayerNorm into single CPU kernels before quantizing
+        ORTOptimizer.from_pretrained(onnx_model).optimize(
+            save_dir=optimized_dir,
+            optimization_config=OptimizationConfig(optimization_level=2, optimize_for_gpu=False),
+        )
+        quantizer = ORTQuantizer.from_pretrained(optimized_dir, file_name="model_optimized.onnx")
+        quantizer.quantize(
+            save_dir=quantized_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False),
+            file_suffix="quantized",
+        )
+        # The quantizer names its output after the input file: model_optimized_quantized.onnx
+        os.replace(
+            os.path.join(quantized_dir, "model_optimized_quantized.onnx"),
+            os.path.join(quantized_dir, ONNX_MODEL_FILE),
+        )
+        try:
+            os.replace(quantized_dir, model_dir)
+        except OSError:
+            # Another worker finished first; its export is identical, so keep it
+            if not os.path.exists(os.path.join(model_dir, ONNX_MODEL_FILE)):
+                raise
+
+
+@functools.lru_cache(maxsize=1)
+def _get_embeddings() -> Embeddings:
+    """Load the embedding model once per process and share it across RAGService instances."""
+    onnx_model_path = os.path.join(ONNX_MODEL_DIR, ONNX_MODEL_FILE)
+    if not os.path.exists(onnx_model_path):
+        try:
+            _export_quantized_onnx(ONNX_MODEL_DIR)
+        except ImportError:
+            pass  # optimum not installed: use SentenceTransformer below
+        except Exception as e:
+            logger.warning(f"ONNX export failed, falling back to SentenceTransformer: {e}")
+
+    if os.path.exists(onnx_model_path):
+        try:
+            embedder = _OnnxEmbedder(ONNX_MODEL_DIR)
+            logger.info(f"Using quantized ONNX embedding model from {ONNX_MODEL_DIR}.")
+            return embedder
+        except ImportError:
+            logger.warning("optimum/onnxruntime not installed; falling back to SentenceTransformer.")
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME, device=device)
+    if device == "cuda":
+        model.half()  # FP16 halves memory traffic and runs the GEMMs on tensor cores
+        logger.info("Embedding model loaded on CUDA in FP16.")
+    elif QUANTIZE_QUERY_ENCODER:
+        # Quantizing takes well under a second, so it is redone at startup rather than persisted
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        logger.info("Embedding model quantized to INT8 for CPU inference.")
+    model.eval()
+    return _SentenceTransformerEmbedder(model)
+
+
+@functools.lru_cache(maxsize=1024)
+def _embed_query(normalized_query: str) -> np.ndarray:
+    """Embed a normalized query once; repeated queries skip the encoder forward pass.
+
+    Cached vectors are kept as read-only FP16 arrays (768 bytes vs ~12 KB for a tuple of floats).
+    """
+    vector = np.asarray(_get_embeddings().embed_query(normalized_query), dtype=np.float16)
+    vector.setflags(write=False)
+    return vector
+
+
+@functools.lru_cache(maxsize=1)
+def _get_reranker() -> Optional[CrossEncoder]:
+    """Load the cross-encoder once per process; None if disabled or it cannot be loaded."""
+    if not USE_RERANKER:
+        return None
+    try:
+        return CrossEncoder(RERANKER_MODEL_NAME)
+    except Exception as e:
+        logger.warning(f"Cross-encoder unavailable, falling back to vector ranking: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_collection() -> chromadb.Collection:
+    """Open the persisted Chroma collection once per process (read-only at serve time).
+
+    The HNSW segment files are loaded from the persist directory, so multiple uvicorn workers read
+    the same files through the OS page cache instead of each rebuilding an index.
+    """
+    client = chromadb.PersistentClient(
+        path=CHROMA_DB_DIR, settings=Settings(anonymized_telemetry=False)
+    )
+    return client.get_collection(CHROMA_COLLECTION_NAME)
+
+
+class _TokenBucket:
+    """Thread-safe token bucket; callers that find it empty reserve a future token and sleep until then.
+
+    A rate of zero or less disables the limiter: every acquire returns immediately.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token (possibly going into debt) and return how long to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+# Shared by every RAGService in the process, since the Gemini quota is per API key
+_llm_rate_limiter = _TokenBucket(LLM_REQUESTS_PER_MINUTE / 60.0, LLM_BURST_REQUESTS)
+
+
+class _JsonArrayStreamCutter:
+    """Tracks a streamed JSON array, collecting each top-level object as it closes, and reports
+    when `limit` of them have."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._text = ""
+        self.closed_objects = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._object_start = 0
+        self._completed: List[str] = []
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; returns True once enough objects are complete to stop streaming."""
+        offset = len(self._text)
+        for i, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '[{':
+                if ch == '{' and self._depth == 1:
+                    self._object_start = offset + i
+                self._depth += 1
+            elif ch in ']}':
+                self._depth -= 1
+                if ch == '}' and self._depth == 1:
+                    self.closed_objects += 1
+                    self._completed.append((self._text + chunk[:i + 1])[self._object_start:])
+                    if self.closed_objects >= self.limit:
+                        self._text += chunk[:i + 1]
+                        return True
+        self._text += chunk
+        return False
+
+    def pop_completed(self) -> List[str]:
+        """The top-level objects (as JSON text) that closed since the last call."""
+        completed, self._completed = self._completed, []
+        return completed
+
+    def text(self) -> str:
+        """The JSON received so far, closed off as a valid array if streaming was cut short."""
+        return self._text + ']' if self.closed_objects >= self.limit else self._text
+
 
 class RAGService:
     AVAILABLE_LOCATIONS = [
@@ -54,15 +370,48 @@ class RAGService:
         "a": "series A", 
     }
 
+    # Every filter keyword (full location names, location aliases, stages) compiled into one
+    # whole-word alternation, longest first so "pre-seed" beats "seed" and full names beat aliases.
+    # A single scan of the query then yields all hits, whatever the size of the mappings.
+    _FILTER_TERMS = {
+        **{location.lower(): ("location", location) for location in AVAILABLE_LOCATIONS},
+        **{alias: ("location_alias", canonical) for alias, canonical in LOCATION_MAPPING.items()},
+        **{keyword: ("stage", stage_value) for keyword, stage_value in STAGE_MAPPING.items()},
+    }
+    _FILTER_RE = re.compile(
+        r'\b(' + '|'.join(sorted(map(re.escape, _FILTER_TERMS), key=len, reverse=True)) + r')\b',
+        re.IGNORECASE
+    )
+    # page_content sentences duplicated by the explicit stage/location context fields
+    _REDUNDANT_CONTENT_RE = re.compile(r'(?:Location|Stage): [^.]*\.\s*')
+
+    # When several stage keywords appear, the one listed first in STAGE_MAPPING wins
+    _STAGE_PRIORITY = {keyword: i for i, keyword in enumerate(STAGE_MAPPING)}
+    # Literal founder-name lookups: the whole query in double quotes, or "name: <founder name>"
+    _NAME_LOOKUP_RE = re.compile(r'^\s*(?:"([^"]+)"|name:\s*(.+?))\s*$', re.IGNORECASE)
+    # A bare "a" maps to series A above but is usually just the article, so it never on its own
+    # qualifies a query for the filter-only fast path
+    _AMBIGUOUS_STAGE_KEYWORDS = frozenset({"a"})
+    # Words that carry no topic when deciding whether a query is filter-only: function words,
+    # generic "show me people" phrasing and stage/location wording. Roles (engineer, investor) are
+    # not filtered on, so they stay content words.
+    _FILLER_WORDS = frozenset({
+        "a", "an", "the", "in", "at", "on", "of", "for", "from", "to", "with", "and", "or",
+        "who", "is", "are", "any", "some", "me", "all", "find", "show", "list", "get",
+        "founder", "founders", "people", "person", "profiles", "someone", "anyone",
+        "startup", "startups", "stage", "stages", "based", "located", "living",
+    })
+
     def __init__(self):
-        print("Initializing RAG Service...")
+        logger.info("Initializing RAG Service...")
         
         self.embeddings = None
-        self.vectorstore = None
-        self.retriever = None
+        self.collection = None
         self.llm = None
         self.db_path = None
-        self.rag_chain = None
+        self.retrieval_cache = QueryCache(RETRIEVAL_CACHE_SIZE, RETRIEVAL_CACHE_TTL_SECONDS)
+        self.llm_cache = self._create_llm_cache()
+        self.record_cache = QueryCache(RECORD_CACHE_SIZE, RETRIEVAL_CACHE_TTL_SECONDS)
         self.is_initialized = False
         
         try:
@@ -70,24 +419,36 @@ class RAGService:
             self._load_sqlite_db_path()
             self._setup_llm_chain()
             self.is_initialized = True
-            print("RAG Service initialized successfully.")
+            logger.info("RAG Service initialized successfully.")
         except Exception as e:
-            print(f"CRITICAL ERROR: RAG Service initialization failed: {e}")
+            logger.critical(f"RAG Service initialization failed: {e}")
             self.is_initialized = False
 
+    def _create_llm_cache(self) -> SemanticCache:
+        """The SQLite-backed semantic LLM cache, or an in-memory one if it is disabled or unavailable."""
+        if LLM_CACHE_DB_PATH:
+            try:
+                return PersistentSemanticCache(
+                    LLM_CACHE_DB_PATH, LLM_CACHE_SIZE, LLM_CACHE_SIMILARITY, LLM_CACHE_TTL_SECONDS,
+                    LLM_CACHE_MAX_ROWS,
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent LLM cache unavailable, keeping it in memory: {e}")
+        return SemanticCache(LLM_CACHE_SIZE, LLM_CACHE_SIMILARITY)
+
     def _get_api_key(self) -> str:
         """Fetch API Key from Streamlit secrets or environment."""
         try:
             import streamlit as st
             if "GEMINI_API_KEY" in st.secrets:
-                print("API Key found in Streamlit secrets.")
+                logger.info("API Key found in Streamlit secrets.")
                 return st.secrets["GEMINI_API_KEY"]
         except ImportError:
             pass
 
         api_key = os.getenv("GEMINI_API_KEY")
         if api_key:
-            print("API Key found in environment variables.")
+            logger.info("API Key found in environment variables.")
             return api_key
 
         raise ValueError(
@@ -98,29 +459,42 @@ class RAGService:
         if not os.path.exists(CHROMA_DB_DIR):
             raise FileNotFoundError(f"Chroma DB not found at {CHROMA_DB_DIR}")
 
-        self.embeddings = SentenceTransformerEmbeddings(model_name=EMBEDDING_MODEL_NAME)
-        self.vectorstore = Chroma(
-            persist_directory=CHROMA_DB_DIR, 
-            embedding_function=self.embeddings
-        )
-        print(f"Vector store loaded with {self.vectorstore._collection.count()} documents.")
+        self.embeddings = _get_embeddings()
+        self.collection = _get_collection()
+        document_count = self.collection.count()
+        if document_count == 0:
+            raise ValueError(f"Chroma collection '{CHROMA_COLLECTION_NAME}' is empty. Run function/indexing.py first.")
+        logger.info(f"Vector store loaded with {document_count} documents.")
 
     def _load_sqlite_db_path(self):
         if not os.path.exists(SQLITE_DB_PATH):
             raise FileNotFoundError(f"SQLite DB not found at {SQLITE_DB_PATH}")
             
         self.db_path = SQLITE_DB_PATH
-        temp_db = sqlite_utils.Database(SQLITE_DB_PATH)
-        count = temp_db["people"].count
-        print(f"SQLite database verified with {count} records.")
+        # Reuse this thread's read-only connection instead of opening a throwaway one
+        count = self._conn().execute("SELECT COUNT(*) FROM people").fetchone()[0]
+        logger.info(f"SQLite database verified with {count} records.")
 
     def _setup_llm_chain(self):
         api_key = self._get_api_key()
+        # Cheap offline shape check only; the key is really validated by the first user query,
+        # so startup never waits on a Gemini round trip.
+        api_key = api_key.strip()
+        if api_key == GEMINI_API_KEY_PLACEHOLDER:
+            raise EnvironmentError(
+                "GEMINI_API_KEY is still the template placeholder. Set your key in environment or .streamlit/secrets.toml"
+            )
+        if not GEMINI_API_KEY_PATTERN.fullmatch(api_key):
+            raise EnvironmentError("GEMINI_API_KEY looks malformed. Check environment or .streamlit/secrets.toml")
         
         self.llm = ChatGoogleGenerativeAI(
             model="gemini-2.5-flash", 
             api_key=api_key,
-            temperature=0.0
+            temperature=0.0,
+            response_mime_type="application/json",
+            # Five short JSON objects fit comfortably; thinking disabled so it can't eat the budget
+            max_output_tokens=LLM_MAX_OUTPUT_TOKENS,
+            thinking_budget=0
         )
         
         template = """You are an expert matchmaking assistant analyzing founder profiles.
@@ -132,7 +506,7 @@ Retrieved Profiles (JSON):
 {context}
 
 Instructions:
-1. Identify the TOP 5 best matches based on the query.
+1. Identify the TOP 5 best matches based on the query. Profiles are listed from most to least relevant.
 2. The provided profiles have ALREADY been filtered by any strict criteria (like stage or location) present in the User Query. Do NOT filter them again.
 3. Your final output must be from the provided profiles.
 4. Generate a clear 1-2 sentence explanation for each match.
@@ -149,174 +523,544 @@ Output Format (JSON array only, no markdown):
 If no good matches exist, return: []
 """
         
-        prompt = ChatPromptTemplate.from_template(template)
-        self.rag_chain = prompt | self.llm | StrOutputParser()
+        # Formatted directly into a single message and sent to the model, without a
+        # ChatPromptTemplate/Runnable chain and its per-call validation and parser plumbing
+        self._format_prompt = template.format
         
     # NEW METHOD: Extracts the stage filter
+    def _parse_query_for_filters(self, query: str) -> Tuple[Optional[str], Optional[str]]:
+        """Extract (stage, location) filters from the query in a single regex scan."""
+        stage_keywords = []
+        exact_location = None
+        alias_location = None
+        for match in self._FILTER_RE.finditer(query):
+            keyword = match.group(1).lower()
+            kind, value = self._FILTER_TERMS[keyword]
+            if kind == "stage":
+                stage_keywords.append(keyword)
+            elif kind == "location" and exact_location is None:
+                exact_location = value
+            elif kind == "location_alias" and alias_location is None:
+                alias_location = value
+
+        stage_filter = None
+        if stage_keywords:
+            stage_filter = self.STAGE_MAPPING[min(stage_keywords, key=self._STAGE_PRIORITY.__getitem__)]
+        # Exact location names take precedence over aliases
+        return stage_filter, exact_location or alias_location
+
     def _extract_stage_filter(self, query: str) -> Optional[str]:
         """Extracts the stage filter from the query based on predefined keywords."""
-        lower_query = query.lower()
-
-        for keyword, stage_value in self.STAGE_MAPPING.items():
-            # Use regex to match whole words (e.g., prevent "series a" matching "area")
-            if re.search(r'\b' + re.escape(keyword) + r'\b', lower_query):
-                return stage_value
-        
-        return None
+        return self._parse_query_for_filters(query)[0]
 
     def _parse_location(self, query: str) -> Optional[str]:
         """Extract and normalize location from query."""
-        lower_query = query.lower()
-        
-        # Check exact locations first
-        for location in self.AVAILABLE_LOCATIONS:
-            if location.lower() in lower_query:
-                return location
-        
-        # Check aliases
-        for alias, canonical in self.LOCATION_MAPPING.items():
-            if re.search(r'\b' + re.escape(alias) + r'\b', lower_query):
-                return canonical
-                
-        return None
+        return self._parse_query_for_filters(query)[1]
+
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's cached read-only SQLite connection, opening it on first use."""
+        conn = getattr(_thread_local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            # Read-tuned: large page cache and mmap keep the whole (small) DB resident in memory
+            conn.executescript(
+                "PRAGMA cache_size=-65536; PRAGMA mmap_size=268435456; PRAGMA temp_store=MEMORY;"
+            )
+            _thread_local.conn = conn
+        return conn
 
     def _get_full_record(self, doc_id: str) -> Optional[Dict]:
-        """Retrieve full record from SQLite (thread-safe)."""
+        """Retrieve full record from SQLite (thread-safe, LRU cached)."""
+        return self._get_full_records([doc_id]).get(doc_id)
+
+    def _get_full_records(self, doc_ids: List[str]) -> Dict[str, Dict]:
+        """Retrieve several full records, keyed by id: hot ids from the LRU, the rest in one SQLite query."""
+        records = {}
+        missing_ids = []
+        for doc_id in dict.fromkeys(doc_ids):
+            record = self.record_cache.get(doc_id)
+            if record is None:
+                missing_ids.append(doc_id)
+            else:
+                records[doc_id] = record
+        if not missing_ids:
+            return records
+
         try:
-            db_conn = sqlite_utils.Database(self.db_path)
-            record = db_conn["people"].get(doc_id)
-            return record 
+            placeholders = ",".join("?" * len(missing_ids))
+            rows = self._conn().execute(
+                f"SELECT * FROM people WHERE id IN ({placeholders})", missing_ids
+            )
+            for row in rows:
+                record = dict(row)
+                self.record_cache.put(record["id"], record)
+                records[record["id"]] = record
         except Exception as e:
-            print(f"Error retrieving record {doc_id}: {e}")
+            logger.error(f"Error retrieving records {missing_ids}: {e}")
+        return records
+
+    def _build_chroma_filter(self, query: str) -> tuple:
+        """Extract hard filters from the query and build the Chroma WHERE clause.
+
+        Returns (stage_filter, location_filter, chroma_filter_arg).
+        """
+        # 1. FILTER EXTRACTION
+        stage_filter, location_filter = self._parse_query_for_filters(query)
+        
+        # 2. BUILD CHROMA WHERE CLAUSE
+        # Collect conditions into a list
+        conditions = []
+        if stage_filter:
+            # Condition 1: documents where 'stage' equals the extracted stage
+            conditions.append({"stage": stage_filter})
+        if location_filter:
+            # Condition 2: documents where 'location' equals the extracted location
+            conditions.append({"location": location_filter})
+            
+        # 3. BUILD THE FINAL FILTER ARGUMENT (FIXED LOGIC)
+        chroma_filter_arg = None
+        if conditions:
+            if len(conditions) == 1:
+                # If only one condition (stage OR location), use it directly
+                chroma_filter_arg = conditions[0]
+            else:
+                # FIX: If multiple conditions, explicitly use the $and operator
+                # This resolves the error: "Expected where to have exactly one operator"
+                chroma_filter_arg = {"$and": conditions}
+            
+        logger.info(f"ChromaDB WHERE clause: {chroma_filter_arg}")
+        return stage_filter, location_filter, chroma_filter_arg
+
+    def _retrieve(self, query: str, chroma_filter_arg: Optional[Dict]) -> List[Document]:
+        """Vector search against Chroma with the hard metadata filter applied (LRU + TTL cached)."""
+        # The embedding model is uncased, so lowercasing the cache key loses nothing
+        normalized_query = query.strip().lower()
+        cache_key = QueryCache.make_key(normalized_query, chroma_filter_arg)
+        cached_docs = self.retrieval_cache.get(cache_key)
+        if cached_docs is not None:
+            logger.info(f"Retrieved {len(cached_docs)} documents from the retrieval cache.")
+            return cached_docs
+
+        # Chroma's HNSW index is FP32, so widen at the query boundary
+        query_vector = _embed_query(normalized_query).astype(np.float32).tolist()
+        # Query the collection directly with the precomputed vector (no distances needed)
+        results = self.collection.query(
+            query_embeddings=[query_vector],
+            n_results=TOP_K_DOCUMENTS,
+            where=chroma_filter_arg or None,
+            include=["documents", "metadatas"]
+        )
+        
+        retrieved_docs = self._to_documents(results["documents"][0], results["metadatas"][0])
+        logger.info(f"Retrieved {len(retrieved_docs)} documents after strict filtering.")
+        
+        self.retrieval_cache.put(cache_key, retrieved_docs)
+        return retrieved_docs
+
+    def _to_documents(self, contents: List[str], metadatas: List[Optional[Dict]]) -> List[Document]:
+        return [
+            Document(page_content=content, metadata=metadata or {})
+            for content, metadata in zip(contents, metadatas)
+        ]
+
+    def _prefetch_retrievals(self, queries: List[str]):
+        """Fill the retrieval cache for several queries with one encoder pass and one Chroma query
+        per distinct metadata filter."""
+        groups: Dict[str, Tuple[Optional[Dict], List[Tuple[str, str]]]] = {}
+        seen = set()
+        for query in queries:
+            _, _, chroma_filter_arg = self._build_chroma_filter(query)
+            normalized_query = query.strip().lower()
+            cache_key = QueryCache.make_key(normalized_query, chroma_filter_arg)
+            if cache_key not in seen and self.retrieval_cache.get(cache_key) is None:
+                seen.add(cache_key)
+                group = groups.setdefault(QueryCache.make_key(chroma_filter_arg), (chroma_filter_arg, []))
+                group[1].append((cache_key, normalized_query))
+        if not groups:
+            return
+
+        pending = [item for _, items in groups.values() for item in items]
+        vectors = dict(zip(
+            (cache_key for cache_key, _ in pending),
+            self.embeddings.embed_documents([normalized_query for _, normalized_query in pending]),
+        ))
+        for chroma_filter_arg, items in groups.values():
+            results = self.collection.query(
+                query_embeddings=[vectors[cache_key] for cache_key, _ in items],
+                n_results=TOP_K_DOCUMENTS,
+                where=chroma_filter_arg or None,
+                include=["documents", "metadatas"]
+            )
+            for (cache_key, _), contents, metadatas in zip(items, results["documents"], results["metadatas"]):
+                self.retrieval_cache.put(cache_key, self._to_documents(contents, metadatas))
+        logger.info(f"Prefetched retrieval for {len(pending)} queries in {len(groups)} Chroma calls.")
+
+    def warm_up(self):
+        """Pay one-time lazy-init costs (torch kernels, HNSW page-in, SQLite schema) before serving."""
+        if not self.is_initialized:
+            return
+        start = time.perf_counter()
+        # Bypass the query caches so the warmup string doesn't occupy an entry
+        vector = self.embeddings.embed_query("warmup")
+        self.collection.query(query_embeddings=[vector], n_results=1, include=[])
+        self._conn().execute("SELECT 1 FROM people LIMIT 1").fetchone()
+        logger.info(f"RAG Service warmed up in {time.perf_counter() - start:.2f}s.")
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters for the retrieval, semantic LLM and record caches."""
+        return {
+            "retrieval": self.retrieval_cache.stats(),
+            "llm": self.llm_cache.stats(),
+            "records": self.record_cache.stats(),
+        }
+
+    def _is_filter_only_query(
+        self, query: str, stage_filter: Optional[str], location_filter: Optional[str]
+    ) -> bool:
+        """True when the query is nothing but its filters (and filler words), so there is no topic
+        for retrieval or LLM ranking to match on."""
+        if not (stage_filter or location_filter):
+            return False
+        keywords = {match.group(1).lower() for match in self._FILTER_RE.finditer(query)}
+        stage_keywords = {keyword for keyword in keywords if self._FILTER_TERMS[keyword][0] == "stage"}
+        if stage_filter and stage_keywords <= self._AMBIGUOUS_STAGE_KEYWORDS:
+            return False
+        free_words = re.findall(r"[\w'-]+", self._FILTER_RE.sub(' ', query).lower())
+        return all(word in self._FILLER_WORDS for word in free_words)
+
+    def _filter_explanation(self, stage_filter: Optional[str], location_filter: Optional[str]) -> str:
+        criteria = ", ".join(filter(None, [
+            f"{stage_filter} stage" if stage_filter else None,
+            f"based in {location_filter}" if location_filter else None,
+        ]))
+        return f"Matches your filters: {criteria}."
+
+    def _literal_lookup(
+        self, query: str, stage_filter: Optional[str], location_filter: Optional[str]
+    ) -> Optional[List[Dict]]:
+        """Answer exact-name and pure-filter queries straight from SQLite, skipping the encoder,
+        the vector search and the LLM. Returns None when the query needs the full RAG path.
+
+        Only queries with no topic words left take the filter path (see _is_filter_only_query);
+        anything else is retrieved semantically within the filter, since rowid order ignores topic.
+        """
+        name_match = self._NAME_LOOKUP_RE.match(query)
+        if name_match:
+            name = name_match.group(1) or name_match.group(2)
+            sql = "SELECT * FROM people WHERE founder_name = ? COLLATE NOCASE ORDER BY rowid LIMIT ?"
+            params = [name.strip(), MAX_MATCHES]
+            explanation = f"Exact name match for \"{name.strip()}\"."
+            # A stage parsed out of the name itself ("A", "Seed") must not filter an explicit lookup
+            stage_filter = None
+        elif self._is_filter_only_query(query, stage_filter, location_filter):
+            conditions = {"stage": stage_filter, "location": location_filter}
+            where = " AND ".join(f"{column} = ?" for column, value in conditions.items() if value)
+            sql = f"SELECT * FROM people WHERE {where} ORDER BY rowid LIMIT ?"
+            params = [value for value in conditions.values() if value] + [MAX_MATCHES]
+            explanation = self._filter_explanation(stage_filter, location_filter)
+        else:
             return None
 
-    def search(self, query: str) -> List[Dict]:
-        """Perform RAG search with hard metadata filtering (Stage and Location)."""
+        records = {}
+        for row in self._conn().execute(sql, params):
+            record = dict(row)
+            self.record_cache.put(record["id"], record)
+            records[record["id"]] = record
+        if name_match and not records:
+            return None  # Not a known founder: treat the quoted text as a normal query
+        logger.info(f"Literal lookup answered the query with {len(records)} records.")
+        top_matches = [{"csv_id": doc_id, "match_explanation": explanation} for doc_id in records]
+        return self._compile_results(top_matches, records, stage_filter)
+
+    def _select_context(self, query: str, retrieved_docs: List[Document]) -> List[Document]:
+        """Pick the candidates sent to the LLM: cross-encoder top MAX_MATCHES, else the vector top N."""
+        reranker = _get_reranker()
+        if reranker is None:
+            return retrieved_docs[:LLM_CONTEXT_DOCUMENTS]
+
+        with torch.inference_mode():
+            scores = reranker.predict([(query, doc.page_content) for doc in retrieved_docs])
+        ranked = sorted(zip(scores, range(len(retrieved_docs))), reverse=True)
+        return [retrieved_docs[i] for _, i in ranked[:MAX_MATCHES]]
+
+    def _trim_content(self, content: str) -> str:
+        """Drop the Location/Stage sentences (sent as fields already) and cap the length."""
+        content = self._REDUNDANT_CONTENT_RE.sub('', content).strip()
+        if len(content) > LLM_CONTEXT_CHARS_PER_DOC:
+            content = content[:LLM_CONTEXT_CHARS_PER_DOC].rstrip() + "…"
+        return content
+
+    def _format_context(self, context_docs: List[Document]) -> str:
+        """Serialize the LLM context as compact JSON to save prompt tokens."""
+        return orjson.dumps([
+            {
+                "id": doc.metadata.get('id'),
+                "stage": doc.metadata.get('stage'), 
+                "location": doc.metadata.get('location'),
+                "content": self._trim_content(doc.page_content)
+            }
+            for doc in context_docs
+        ]).decode()
+
+    def _parse_llm_output(self, llm_output: str) -> List[Dict]:
+        """Parse the LLM ranking (JSON mode guarantees raw JSON, no markdown fences)."""
+        try:
+            llm_matches = orjson.loads(llm_output)
+        except orjson.JSONDecodeError as e:
+            logger.error(f"JSON parse error: {e}")
+            logger.error(f"Raw output: {llm_output}")
+            return []
+        
+        if not isinstance(llm_matches, list):
+            llm_matches = [llm_matches] if isinstance(llm_matches, dict) else []
+        return [m for m in llm_matches[:MAX_MATCHES] if isinstance(m, dict)]
+
+    def _compile_results(
+        self, top_matches: List[Dict], full_records: Dict[str, Dict], stage_filter: Optional[str]
+    ) -> List[Dict]:
+        """Join the LLM matches with their full SQLite records."""
+        # The LLM should only return provided profiles, but fetch any stragglers just in case
+        missing_ids = [
+            m['csv_id'] for m in top_matches if m.get('csv_id') and m['csv_id'] not in full_records
+        ]
+        if missing_ids:
+            full_records = {**full_records, **self._get_full_records(missing_ids)}
+
+        results = []
+        for match in top_matches:
+            doc_id = match.get('csv_id')
+            if not doc_id:
+                continue
+            
+            full_record = full_records.get(doc_id)
+            if not full_record:
+                continue
+            
+            # FINAL VALIDATION: Ensure the returned record still matches the stage filter (sanity check)
+            if stage_filter and full_record.get('stage') != stage_filter:
+                continue 
+
+            result = {
+                "id": doc_id,
+                "founder_name": full_record.get("founder_name", "N/A"),
+                "role": full_record.get("role", "N/A"),
+                "company": full_record.get("company", "N/A"),
+                "location": full_record.get("location", "N/A"),
+                "match_explanation": match.get("match_explanation", "Match found based on profile."),
+                "provenance": {
+                    "matched_on_fields": "idea, about, keywords, location",
+                    "csv_id": doc_id,
+                },
+                "full_details": {
+                    "idea": full_record.get("idea", ""),
+                    "about": full_record.get("about", ""),
+                    "keywords": full_record.get("keywords", ""),
+                    "linked_in": full_record.get("linked_in", "#"),
+                    "notes": full_record.get("notes", ""),
+                    "stage": full_record.get("stage", ""),
+                }
+            }
+            results.append(result)
+        return results
+
+    def _llm_messages(self, query: str, context: str) -> List[HumanMessage]:
+        """The ranking prompt for this query and context, as the single user message sent to Gemini."""
+        return [HumanMessage(content=self._format_prompt(query=query, context=context))]
+
+    def _stream_matches(self, query: str, context: str) -> Iterator[Dict]:
+        """Stream the LLM ranking, yielding each match as soon as its JSON object is complete and
+        stopping once MAX_MATCHES have arrived."""
+        _llm_rate_limiter.acquire()
+        cutter = _JsonArrayStreamCutter(MAX_MATCHES)
+        streamed_any = False
+        stream = self.llm.stream(self._llm_messages(query, context))
+        try:
+            for chunk in stream:
+                done = cutter.feed(chunk.content)
+                for raw_match in cutter.pop_completed():
+                    try:
+                        match = orjson.loads(raw_match)
+                    except orjson.JSONDecodeError as e:
+                        logger.error(f"JSON parse error: {e}")
+                        continue
+                    streamed_any = True
+                    yield match
+                if done:
+                    break
+        finally:
+            stream.close()
+        if not streamed_any:
+            # Not an array of objects (e.g. a bare object): fall back to parsing the whole reply
+            yield from self._parse_llm_output(cutter.text())
+
+    async def _agenerate(self, query: str, context: str) -> str:
+        """Async counterpart of _stream_matches, returning the (possibly cut-off) JSON text."""
+        await _llm_rate_limiter.acquire_async()
+        cutter = _JsonArrayStreamCutter(MAX_MATCHES)
+        stream = self.llm.astream(self._llm_messages(query, context))
+        try:
+            async for chunk in stream:
+                if cutter.feed(chunk.content):
+                    break
+        finally:
+            await stream.aclose()
+        return cutter.text()
+
+    def _llm_cache_key(self, query: str, context_docs: List[Document]) -> Tuple[tuple, np.ndarray]:
+        """Scope (candidates shown to the LLM) and query embedding for the semantic LLM cache.
+
+        Each candidate is identified by id and content hash, so a row re-embedded with new text
+        after an incremental re-index never gets an explanation written for its old text.
+        """
+        scope = tuple((doc.metadata.get('id'), doc.metadata.get(CONTENT_HASH_KEY)) for doc in context_docs)
+        return scope, _embed_query(query.strip().lower()).astype(np.float32)
+
+    def _iter_rank(self, query: str, context_docs: List[Document]) -> Iterator[Dict]:
+        """LLM ranking/explanations for the candidates as they stream in, or from the semantic cache."""
+        scope, query_embedding = self._llm_cache_key(query, context_docs)
+        cached = self.llm_cache.get(scope, query_embedding)
+        if cached is not None:
+            logger.info("LLM ranking served from the semantic cache.")
+            yield from cached
+            return
+
+        top_matches = []
+        for match in self._stream_matches(query, self._format_context(context_docs)):
+            top_matches.append(match)
+            yield match
+        if top_matches:
+            self.llm_cache.put(scope, query_embedding, top_matches)
+
+    async def _arank(self, query: str, context_docs: List[Document]) -> List[Dict]:
+        """Async counterpart of _iter_rank, returning the whole ranking at once."""
+        # The query encoder and the cache's SQLite reads/writes run off the event loop
+        scope, query_embedding = await asyncio.to_thread(self._llm_cache_key, query, context_docs)
+        cached = await asyncio.to_thread(self.llm_cache.get, scope, query_embedding)
+        if cached is not None:
+            logger.info("LLM ranking served from the semantic cache.")
+            return cached
+
+        top_matches = self._parse_llm_output(await self._agenerate(query, self._format_context(context_docs)))
+        if top_matches:
+            await asyncio.to_thread(self.llm_cache.put, scope, query_embedding, top_matches)
+        return top_matches
+
+    def iter_search(self, query: str) -> Iterator[Dict]:
+        """Perform RAG search with hard metadata filtering (Stage and Location), yielding each
+        result as soon as the LLM has finished explaining it."""
         if not self.is_initialized:
             raise Exception("RAG Service not initialized. Check logs.")
             
         try:
-            # 1. FILTER EXTRACTION
-            stage_filter = self._extract_stage_filter(query)
-            location_filter = self._parse_location(query)
-            
-            # 2. BUILD CHROMA WHERE CLAUSE
-            # Collect conditions into a list
-            conditions = []
-            if stage_filter:
-                # Condition 1: documents where 'stage' equals the extracted stage
-                conditions.append({"stage": stage_filter})
-            if location_filter:
-                # Condition 2: documents where 'location' equals the extracted location
-                conditions.append({"location": location_filter})
-                
-            # 3. BUILD THE FINAL FILTER ARGUMENT (FIXED LOGIC)
-            chroma_filter_arg = None
-            if conditions:
-                if len(conditions) == 1:
-                    # If only one condition (stage OR location), use it directly
-                    chroma_filter_arg = conditions[0]
-                else:
-                    # FIX: If multiple conditions, explicitly use the $and operator
-                    # This resolves the error: "Expected where to have exactly one operator"
-                    chroma_filter_arg = {"$and": conditions}
-                
-            print(f"ChromaDB WHERE clause: {chroma_filter_arg}")
+            stage_filter, location_filter, chroma_filter_arg = self._build_chroma_filter(query)
+
+            # Fast path: exact names and pure filter queries need no embedding, vector search or LLM
+            literal_results = self._literal_lookup(query, stage_filter, location_filter)
+            if literal_results is not None:
+                yield from literal_results
+                return
             
             # 4. RETRIEVAL (Hybrid Search with Filter)
-            retrieved_docs_and_scores = self.vectorstore.similarity_search_with_score(
-                query, 
-                k=TOP_K_DOCUMENTS,
-                filter=chroma_filter_arg 
+            retrieved_docs = self._retrieve(query, chroma_filter_arg)
+            if not retrieved_docs:
+                return
+
+            # 5. Re-rank locally, then prefetch candidate records on a worker thread while
+            # 6. the LLM ranks/explains the survivors on this one
+            context_docs = self._select_context(query, retrieved_docs)
+            records_future = _prefetch_executor.submit(
+                self._get_full_records, [doc.metadata.get('id') for doc in context_docs]
             )
+            full_records = None
+            try:
+                for match in self._iter_rank(query, context_docs):
+                    if full_records is None:
+                        full_records = records_future.result()
+                    # 7. Compile each result as it arrives (may hit SQLite for stragglers)
+                    yield from self._compile_results([match], full_records, stage_filter)
+            finally:
+                records_future.cancel()
             
-            print(f"Retrieved {len(retrieved_docs_and_scores)} documents after strict filtering.")
-            
+        except Exception as e:
+            logger.error(f"Search error: {e}")
+            raise Exception(f"RAG search failed: {e}")
 
-            if not retrieved_docs_and_scores:
-                return []
-            
-            # Take only the document objects
-            retrieved_docs = [doc for doc, score in retrieved_docs_and_scores]
-
-            # 4. Format context for LLM (top 10 subset)
-            context_json = json.dumps([
-                {
-                    "id": doc.metadata.get('id'),
-                    "stage": doc.metadata.get('stage'), 
-                    "location": doc.metadata.get('location'),
-                    "content": doc.page_content
-                }
-                for doc in retrieved_docs[:10] # Pass a smaller, highly relevant set to LLM
-            ], indent=2)
-            
-            # 5. Get LLM rankings (Generation)
-            llm_output = self.rag_chain.invoke({
-                "query": query,
-                "context": context_json
-            })
+    def search_batch(self, queries: List[str]) -> List[List[Dict]]:
+        """Run several searches, batching the embedding and Chroma work they share up front."""
+        if not self.is_initialized:
+            raise Exception("RAG Service not initialized. Check logs.")
+        self._prefetch_retrievals(queries)
+        return [self.search(query) for query in queries]
+
+    def warm_up_queries(self, queries: List[str]):
+        """Run everything but the LLM for these queries: fills the retrieval and record caches and
+        loads the re-ranker, without spending Gemini quota on searches nobody may make."""
+        if not self.is_initialized:
+            raise Exception("RAG Service not initialized. Check logs.")
+        self._prefetch_retrievals(queries)
+        for query in queries:
+            chroma_filter_arg = self._build_chroma_filter(query)[2]
+            context_docs = self._select_context(query, self._retrieve(query, chroma_filter_arg))
+            self._get_full_records([doc.metadata.get('id') for doc in context_docs])
+
+    def search(self, query: str) -> List[Dict]:
+        """Perform RAG search with hard metadata filtering (Stage and Location)."""
+        results = list(self.iter_search(query))
+        logger.info(f"Returning {len(results)} final results")
+        return results
+
+    async def search_async(self, query: str) -> List[Dict]:
+        """Async variant of search: prefetches candidate records from SQLite while the LLM ranks."""
+        if not self.is_initialized:
+            raise Exception("RAG Service not initialized. Check logs.")
             
-            # 6. Parse LLM output
-            llm_output = llm_output.strip()
-            if llm_output.startswith('```json'):
-                llm_output = llm_output[7:]
-            if llm_output.endswith('```'):
-                llm_output = llm_output[:-3]
-            llm_output = llm_output.strip()
+        try:
+            stage_filter, location_filter, chroma_filter_arg = self._build_chroma_filter(query)
+
+            # Fast path: exact names and pure filter queries need no embedding, vector search or LLM
+            literal_results = await asyncio.to_thread(
+                self._literal_lookup, query, stage_filter, location_filter
+            )
+            if literal_results is not None:
+                return literal_results
             
-            try:
-                llm_matches = json.loads(llm_output)
-            except json.JSONDecodeError as e:
-                print(f"JSON parse error: {e}")
-                print(f"Raw output: {llm_output}")
+            # 4. RETRIEVAL (off the event loop; the encoder and HNSW search are CPU-bound)
+            retrieved_docs = await asyncio.to_thread(self._retrieve, query, chroma_filter_arg)
+            if not retrieved_docs:
                 return []
+
+            # 5. Re-rank locally, then kick off LLM ranking and overlap the SQLite prefetch with it
+            context_docs = await asyncio.to_thread(self._select_context, query, retrieved_docs)
+            llm_task = asyncio.create_task(self._arank(query, context_docs))
+            try:
+                full_records = await asyncio.to_thread(
+                    self._get_full_records, [doc.metadata.get('id') for doc in context_docs]
+                )
+            except BaseException:
+                llm_task.cancel()
+                raise
+            top_matches = await llm_task
             
-            if not isinstance(llm_matches, list):
-                llm_matches = [llm_matches] if isinstance(llm_matches, dict) else []
-            
-            # 7. Compile final results
-            results = []
-            for match in llm_matches[:5]:
-                doc_id = match.get('csv_id')
-                if not doc_id:
-                    continue
-                
-                full_record = self._get_full_record(doc_id)
-                if not full_record:
-                    continue
-                
-                # FINAL VALIDATION: Ensure the returned record still matches the stage filter (sanity check)
-                if stage_filter and full_record.get('stage') != stage_filter:
-                    continue 
-
-                result = {
-                    "id": doc_id,
-                    "founder_name": full_record.get("founder_name", "N/A"),
-                    "role": full_record.get("role", "N/A"),
-                    "company": full_record.get("company", "N/A"),
-                    "location": full_record.get("location", "N/A"),
-                    "match_explanation": match.get("match_explanation", "Match found based on profile."),
-                    "provenance": {
-                        "matched_on_fields": "idea, about, keywords, location",
-                        "csv_id": doc_id,
-                    },
-                    "full_details": {
-                        "idea": full_record.get("idea", ""),
-                        "about": full_record.get("about", ""),
-                        "keywords": full_record.get("keywords", ""),
-                        "linked_in": full_record.get("linked_in", "#"),
-                        "notes": full_record.get("notes", ""),
-                        "stage": full_record.get("stage", ""),
-                    }
-                }
-                results.append(result)
-            
-            print(f"Returning {len(results)} final results")
+            # 7. Compile final results (may hit SQLite for stragglers)
+            results = await asyncio.to_thread(self._compile_results, top_matches, full_records, stage_filter)
+            logger.info(f"Returning {len(results)} final results")
             return results
             
         except Exception as e:
-            print(f"Search error: {e}")
+            logger.error(f"Search error: {e}")
             raise Exception(f"RAG search failed: {e}")
 
-# Global service instance
-rag_service = RAGService()
\ No newline at end of file
+# Global service instance, created lazily on first use rather than at import time
+_rag_service: Optional[RAGService] = None
+_rag_service_lock = threading.Lock()
+
+
+def get_rag_service() -> RAGService:
+    """Return the process-wide RAGService, initializing it exactly once."""
+    global _rag_service
+    if _rag_service is None:
+        with _rag_service_lock:
+            if _rag_service is None:
+                _rag_service = RAGService()
+    return _rag_service
\ No newline at end of file
@@ -1,13 +1,20 @@
 # backend/main.py
+import os
+import logging
+import torch
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from llm_service import rag_service
+from llm_service import get_rag_service
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Surface the RAG service's INFO logs alongside uvicorn's
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
 # 1. FastAPI App Initialization
 app = FastAPI(title="RAG Matchmaking API", version="1.0.0")
 
@@ -31,12 +38,11 @@ class QueryRequest(BaseModel):
 # FIX: Ensure RAG Service is fully initialized before serving requests.
 @app.on_event("startup")
 def startup_event():
-    # Because rag_service is imported globally, its __init__ runs on import.
-    # This check ensures we see the initialization message in the logs.
-    if rag_service.retriever is None:
-        # Re-initialize or log error if init failed (e.g., if index wasn't built)
-        # For simplicity, we rely on the error message inside RAGService.__init__
-        pass
+    # The service is created lazily; build it once here so the first request doesn't pay for it.
+    # Initialization errors are logged inside RAGService.__init__
+    # Cap intra-op threads so several uvicorn workers don't oversubscribe the CPU
+    torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+    get_rag_service().warm_up()
 
 # 4. API Endpoint
 @app.post("/api/v1/search")
@@ -48,11 +54,11 @@ async def search_people(request: QueryRequest):
         raise HTTPException(status_code=400, detail="Query cannot be empty")
     
     try:
-        results = rag_service.search(request.query)
+        results = await get_rag_service().search_async(request.query)
         return {"query": request.query, "matches": results}
     except Exception as e:
-        # Log the detailed error on the server side
-        print(f"Error during RAG search: {e}") 
+        # Log the detailed error (with traceback) on the server side
+        logger.exception(f"Error during RAG search: {e}")
         # Return a generic error to the client
         raise HTTPException(status_code=500, detail=f"Internal RAG search error: {e}")
 
@@ -0,0 +1,215 @@
+# backend/query_cache.py
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCache:
+    """Thread-safe in-process LRU cache with a per-entry TTL."""
+
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a stable key from JSON-serializable parts (dict ordering does not matter)."""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class SemanticCache:
+    """Thread-safe LRU of (embedding, value) pairs, looked up by cosine similarity within a scope.
+
+    Entries only match when their scope (e.g. the exact candidate set shown to the LLM) is equal,
+    so a paraphrased query can reuse a previous answer but never one built from other documents.
+    Embeddings are expected to be L2-normalized, making cosine similarity a dot product.
+    """
+
+    def __init__(self, max_size: int = 256, threshold: float = 0.95):
+        self.max_size = max_size
+        self.threshold = threshold
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, scope: Any, embedding: np.ndarray) -> Optional[Any]:
+        with self._lock:
+            value = self._lookup(scope, embedding)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def _lookup(self, scope: Any, embedding: np.ndarray) -> Optional[Any]:
+        """In-memory lookup without touching the hit/miss counters."""
+        with self._lock:
+            candidates = [(entry_id, entry) for entry_id, entry in self._entries.items() if entry[0] == scope]
+            if candidates:
+                matrix = np.stack([entry[1] for _, entry in candidates])
+                similarities = matrix @ np.asarray(embedding, dtype=np.float32)
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    entry_id, entry = candidates[best]
+                    self._entries.move_to_end(entry_id)
+                    return entry[2]
+            return None
+
+    def put(self, scope: Any, embedding: np.ndarray, value: Any) -> None:
+        with self._lock:
+            self._entries[self._next_id] = (scope, np.asarray(embedding, dtype=np.float32), value)
+            self._next_id += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class PersistentSemanticCache(SemanticCache):
+    """SemanticCache backed by a WAL-mode SQLite file, so answers survive restarts and are shared
+    between worker processes.
+
+    Lookups check the in-memory LRU first, then the rows stored for the same scope on disk (the
+    scope narrows the search to a handful of rows, so a numpy dot product replaces any vector index).
+    Rows older than ttl_seconds are ignored and pruned at startup, and only the newest max_rows
+    rows are kept on disk. A disk hit counts once in hits and once in disk_hits, never as a miss.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 256, threshold: float = 0.95,
+                 ttl_seconds: float = 7 * 24 * 3600, max_rows: int = 10000):
+        super().__init__(max_size, threshold)
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.disk_hits = 0
+        self._con = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._con.executescript(
+            "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; "
+            "CREATE TABLE IF NOT EXISTS semantic_cache ("
+            "id INTEGER PRIMARY KEY, scope TEXT NOT NULL, embedding BLOB NOT NULL, "
+            "value TEXT NOT NULL, created_at REAL NOT NULL); "
+            "CREATE INDEX IF NOT EXISTS idx_semantic_cache_scope ON semantic_cache(scope);"
+        )
+        self._con.execute("DELETE FROM semantic_cache WHERE created_at < ?", (time.time() - ttl_seconds,))
+        self._trim()
+
+    def _trim(self) -> None:
+        # Ids only grow, so everything more than max_rows below the newest id is the oldest rows
+        self._con.execute(
+            "DELETE FROM semantic_cache WHERE id <= (SELECT MAX(id) FROM semantic_cache) - ?",
+            (self.max_rows,),
+        )
+
+    def get(self, scope: Any, embedding: np.ndarray) -> Optional[Any]:
+        value = self._lookup(scope, embedding)
+        if value is None:
+            value = self._disk_lookup(scope, np.asarray(embedding, dtype=np.float32))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def _disk_lookup(self, scope: Any, embedding: np.ndarray) -> Optional[Any]:
+        with self._lock:
+            rows = self._con.execute(
+                "SELECT embedding, value FROM semantic_cache WHERE scope = ? AND created_at >= ?",
+                (QueryCache.make_key(scope), time.time() - self.ttl_seconds),
+            ).fetchall()
+        if not rows:
+            return None
+
+        matrix = np.stack([np.frombuffer(blob, dtype=np.float32) for blob, _ in rows])
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+
+        value = json.loads(rows[best][1])
+        with self._lock:
+            self.disk_hits += 1
+        # Promote into memory only; the row is already on disk
+        SemanticCache.put(self, scope, embedding, value)
+        return value
+
+    def put(self, scope: Any, embedding: np.ndarray, value: Any) -> None:
+        super().put(scope, embedding, value)
+        try:
+            with self._lock:
+                self._con.execute(
+                    "INSERT INTO semantic_cache (scope, embedding, value, created_at) VALUES (?, ?, ?, ?)",
+                    (
+                        QueryCache.make_key(scope),
+                        np.asarray(embedding, dtype=np.float32).tobytes(),
+                        json.dumps(value),
+                        time.time(),
+                    ),
+                )
+                self._trim()
+        except sqlite3.Error as e:
+            # Another worker holding the write lock only costs us persistence, not the answer
+            logger.warning(f"Could not persist semantic cache entry: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        stats = super().stats()
+        with self._lock:
+            stats["disk_hits"] = self.disk_hits
+        return stats
@@ -1,74 +1,123 @@
 # function/data_generator.py
-import uuid
 import random
-import csv
+import numpy as np
+import pandas as pd
 from faker import Faker
 
 NUM_ROWS = 700
+CHUNK_SIZE = 10000  # Rows generated and written per batch, bounding peak memory for large NUM_ROWS
 OUTPUT_FILE = 'data/people.csv'
 ROLES = ["Founder", "Co-founder", "Engineer", "PM", "Investor", "Other"]
 STAGES = ["none", "pre-seed", "seed", "series A", "growth"]
-KEYWORDS_POOL = [
+KEYWORDS_POOL = (
 "healthtech", "AI", "marketplace", "fintech", "saas", "devtools",
 "biotech", "e-commerce", "edtech", "social", "blockchain",
 "cleantech", "robotics", "foodtech", "agritech", "cybersecurity"
-]
+)
 LOCATIONS = [
 "San Francisco, USA", "New York, USA", "London, UK", "Berlin, Germany",
 "Bangalore, India", "Singapore, Singapore", "Toronto, Canada", "Paris, France"
 ]
+SEED = 0  # Fixed seed so regenerating the dataset gives the same ids, names, text and picks
+# Rows are drawn in fixed-size blocks, each seeded from (SEED, block number), so every row depends
+# only on SEED and its position, never on the chunk size a caller asks for
+SEED_BLOCK_ROWS = 256
+
+# Faker's locale setup is paid once per process rather than once per generate_data call
+_FAKE = Faker()
+
 
+def generate_chunk(fake, rng, rand, n):
+    """Builds n rows column-by-column: numpy draws the categorical fields, Faker only the free text.
 
-def generate_data(num_rows):
-    fake = Faker()
-    data = []
-    for _ in range(num_rows):
-        founder_name = fake.name()
-        
-        # Ensure a few founders have high-quality 'about' and 'idea'
-        if random.random() < 0.15: # 15% get detailed bios
-            idea = f"A cutting-edge {random.choice(KEYWORDS_POOL)} platform that uses {random.choice(['AI', 'ML', 'blockchain'])} to optimize {fake.bs()}. The solution is focused on achieving a 10x improvement in efficiency."
-            about = f"Former lead engineer at {fake.company()} and two-time startup founder. Successfully raised a $5M seed round. Specializes in scalable architecture and system design. Has a strong track record of building and exiting companies in the {random.choice(KEYWORDS_POOL)} space."
-            stage = random.choice(["seed", "series A", "growth"])
+    fake, rng (numpy Generator) and rand (random.Random) are the caller's seeded sources, so
+    generating data never touches the global RNGs of whoever imported this module.
+    """
+
+    founder_names = [fake.name() for _ in range(n)]
+    # Ensure a few founders have high-quality 'about' and 'idea'
+    detailed = rng.random(n) < 0.15 # 15% get detailed bios
+    idea_topics = rng.choice(KEYWORDS_POOL, n)
+    about_topics = rng.choice(KEYWORDS_POOL, n)
+    techs = rng.choice(['AI', 'ML', 'blockchain'], n)
+    skills = rng.choice(['Python', 'React', 'Data Analysis'], n)
+    stages = np.where(
+        detailed,
+        rng.choice(["seed", "series A", "growth"], n),
+        rng.choice(STAGES, n),
+    )
+
+    ideas, abouts = [], []
+    for i in range(n):
+        if detailed[i]:
+            ideas.append(f"A cutting-edge {idea_topics[i]} platform that uses {techs[i]} to optimize {fake.bs()}. The solution is focused on achieving a 10x improvement in efficiency.")
+            abouts.append(f"Former lead engineer at {fake.company()} and two-time startup founder. Successfully raised a $5M seed round. Specializes in scalable architecture and system design. Has a strong track record of building and exiting companies in the {about_topics[i]} space.")
         else:
-            idea = f"Building a simple, yet effective, {random.choice(KEYWORDS_POOL)} solution for {fake.job()}s."
-            about = f"Started career in {fake.job()}. Has strong skills in {random.choice(['Python', 'React', 'Data Analysis'])} and is passionate about {fake.catch_phrase()}."
-            stage = random.choice(STAGES)
-            
-        # Select 2-4 unique keywords
-        kws = random.sample(KEYWORDS_POOL, k=random.randint(2, 4))
-        
-        data.append({
-            "id": str(uuid.uuid4()),
-            "founder_name": founder_name,
-            "email": fake.email(),
-            "role": random.choice(ROLES),
-            "company": fake.company(),
-            "location": random.choice(LOCATIONS),
-            "idea": idea,
-            "about": about,
-            "keywords": ", ".join(kws),
-            "stage": stage,
-            "linked_in": f"https://linkedin.com/in/{founder_name.replace(' ', '-').lower()}",
-            "notes": fake.text(max_nb_chars=50) if random.random() < 0.2 else "", # 20% have notes
-        })
-        
-    return data
+            ideas.append(f"Building a simple, yet effective, {idea_topics[i]} solution for {fake.job()}s.")
+            abouts.append(f"Started career in {fake.job()}. Has strong skills in {skills[i]} and is passionate about {fake.catch_phrase()}.")
 
-if __name__ == "__main__":
-    print(f"Generating {NUM_ROWS} rows of data...")
-    dataset = generate_data(NUM_ROWS)
+    # Select 2-4 unique keywords
+    keywords = [", ".join(rand.sample(KEYWORDS_POOL, k=int(k))) for k in rng.integers(2, 5, n)]
+    has_notes = rng.random(n) < 0.2 # 20% have notes
 
-    # Get column names from the first dictionary
-    fieldnames = list(dataset[0].keys())
+    return pd.DataFrame({
+        "id": [rng.bytes(16).hex() for _ in range(n)],
+        "founder_name": founder_names,
+        "email": [fake.email() for _ in range(n)],
+        "role": rng.choice(ROLES, n),
+        "company": [fake.company() for _ in range(n)],
+        "location": rng.choice(LOCATIONS, n),
+        "idea": ideas,
+        "about": abouts,
+        "keywords": keywords,
+        "stage": stages,
+        "linked_in": ["https://linkedin.com/in/" + name.replace(' ', '-').lower() for name in founder_names],
+        "notes": [fake.text(max_nb_chars=50) if flag else "" for flag in has_notes],
+    })
 
-    # Write to CSV
-    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(dataset)
+def generate_block(block_index, n):
+    """Generates seed block block_index (n rows) from local generators seeded by (SEED, block_index)."""
+    block_seed = f"{SEED}-{block_index}"
+    fake = _FAKE
+    fake.seed_instance(block_seed)
+    return generate_chunk(fake, np.random.default_rng([SEED, block_index]), random.Random(block_seed), n)
 
-    print(f"Data successfully generated and saved to {OUTPUT_FILE}")
+def generate_data(num_rows, chunk_size=CHUNK_SIZE):
+    """Yields the dataset as DataFrames of about chunk_size rows (whole seed blocks, at least one),
+    so it never exists in memory all at once. The rows are the same whatever chunk_size is."""
+    blocks_per_chunk = max(1, chunk_size // SEED_BLOCK_ROWS)
+    blocks = []
+    for block_index, start in enumerate(range(0, num_rows, SEED_BLOCK_ROWS)):
+        blocks.append(generate_block(block_index, min(SEED_BLOCK_ROWS, num_rows - start)))
+        if len(blocks) == blocks_per_chunk:
+            yield pd.concat(blocks, ignore_index=True)
+            blocks = []
+    if blocks:
+        yield pd.concat(blocks, ignore_index=True)
+
+def iter_dataset_chunks(num_rows=NUM_ROWS, output_file=OUTPUT_FILE, chunk_size=CHUNK_SIZE):
+    """Generates the dataset into output_file, yielding each chunk as soon as it is written,
+    so a consumer (e.g. the indexer) can work on it while the next one is generated."""
+    # pandas' C writer instead of per-row DictWriter calls, header only before the first chunk
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        for i, chunk in enumerate(generate_data(num_rows, chunk_size)):
+            chunk.to_csv(csvfile, index=False, header=i == 0)
+            yield chunk
+
+def write_dataset(num_rows=NUM_ROWS, output_file=OUTPUT_FILE):
+    """Generates the dataset into output_file and returns its first 12 rows (for the README snippet)."""
+    print(f"Generating {num_rows} rows of data...")
+    # Keep only the first rows around for the README snippet
+    snippet_rows = None
+    for chunk in iter_dataset_chunks(num_rows, output_file):
+        if snippet_rows is None:
+            snippet_rows = chunk.head(12).to_dict('records')
+
+    print(f"Data successfully generated and saved to {output_file}")
+    return snippet_rows
+
+if __name__ == "__main__":
+    snippet_rows = write_dataset()
 
     # 4. Generate README snippet
     print("\nREADME Snippet (12 Example Rows):")
@@ -76,7 +125,7 @@ if __name__ == "__main__":
         "| ID (Snippet) | Founder Name | Role | Company | Idea | Keywords | Stage | Location |",
         "|---|---|---|---|---|---|---|---|"
     ]
-    for row in dataset[:12]:
+    for row in snippet_rows:
         row_data = [
             row['id'][:8] + '...',
             row['founder_name'],
@@ -89,4 +138,4 @@ if __name__ == "__main__":
         ]
         readme_snippet.append("| " + " | ".join(row_data) + " |")
 
-    print('\n'.join(readme_snippet))
\ No newline at end of file
+    print('\n'.join(readme_snippet))
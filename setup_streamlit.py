@@ -43,27 +43,23 @@ def check_and_generate_data():
     if missing_files:
         print("⚠️  Missing data files. Generating now...")
         
-        # Run data generator
-        if os.path.exists('data_generator.py'):
-            print("🔄 Running data_generator.py...")
-            subprocess.run([sys.executable, 'data_generator.py'])
-        elif os.path.exists('src/data_generator.py'):
-            print("🔄 Running src/data_generator.py...")
-            subprocess.run([sys.executable, 'src/data_generator.py'])
-        else:
-            print("❌ data_generator.py not found!")
+        # Run the generator and indexer in this interpreter rather than as subprocesses,
+        # so Python start-up and the heavy imports (pandas, torch, chromadb) are paid once
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'function'))
+        try:
+            from data_generator import iter_dataset_chunks
+            from indexing import PIPELINE_BATCH_SIZE, index_data, index_generated_batches
+        except ImportError as e:
+            print(f"❌ Could not import the data scripts from function/: {e}")
             return False
-        
-        # Run indexing
-        if os.path.exists('indexing.py'):
-            print("🔄 Running indexing.py...")
-            subprocess.run([sys.executable, 'indexing.py'])
-        elif os.path.exists('src/indexing.py'):
-            print("🔄 Running src/indexing.py...")
-            subprocess.run([sys.executable, 'src/indexing.py'])
+
+        if 'data/people.csv' in missing_files:
+            # Index each batch while the next one is generated instead of waiting for the whole CSV
+            print("🔄 Generating data/people.csv and building the SQLite and ChromaDB indexes...")
+            index_generated_batches(iter_dataset_chunks(chunk_size=PIPELINE_BATCH_SIZE))
         else:
-            print("❌ indexing.py not found!")
-            return False
+            print("🔄 Building the SQLite and ChromaDB indexes...")
+            index_data()
     else:
         print("✅ All data files exist")
     
@@ -80,17 +76,22 @@ def install_streamlit_requirements():
         "chromadb",
         "sentence-transformers",
         "sqlite-utils",
-        "python-dotenv"
+        "python-dotenv",
+        "orjson"
     ]
     
     print("🔄 Installing Streamlit requirements...")
-    for req in requirements:
-        try:
-            subprocess.run([sys.executable, "-m", "pip", "install", req], 
-                         check=True, capture_output=True)
-            print(f"✅ Installed: {req}")
-        except subprocess.CalledProcessError:
-            print(f"⚠️  Failed to install: {req}")
+    # One pip run resolves all packages together (consistent versions, one startup and metadata pass)
+    # pip's output is streamed line by line rather than captured, so memory stays flat however
+    # much it prints and progress is visible while it runs
+    proc = subprocess.Popen([sys.executable, "-m", "pip", "install", "--prefer-binary", *requirements],
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+    for line in proc.stdout:
+        print(f"   {line.rstrip()}")
+    if proc.wait() == 0:
+        print(f"✅ Installed: {', '.join(requirements)}")
+    else:
+        print(f"⚠️  Failed to install requirements (pip exited with code {proc.returncode})")
 
 def create_gitignore():
     """Create .gitignore file."""
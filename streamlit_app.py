@@ -1,7 +1,11 @@
 # streamlit_app.py - Final Streamlit-Native Version with Maximized Readability
 import streamlit as st
+import logging
 import sys
 import os
+import threading
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 # --- PATH SETUP (Keep as is) ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -9,14 +13,69 @@ if current_dir not in sys.path:
     sys.path.append(current_dir)
 try:
     # Assuming llm_service.py is in a 'backend' folder relative to this file
-    from backend.llm_service import rag_service, RAGService  
+    from backend.llm_service import get_rag_service, RAGService  
+    from backend.query_cache import QueryCache
 except ImportError:
     try:
         sys.path.append(os.path.join(current_dir, 'backend'))
-        from llm_service import rag_service, RAGService # Corrected import path for context
+        from llm_service import get_rag_service, RAGService # Corrected import path for context
+        from query_cache import QueryCache
     except ImportError as e:
         st.error(f"Could not find RAGService. Please ensure llm_service.py is accessible. Details: {e}")
         st.stop()
+
+@st.cache_resource(show_spinner="Loading RAG Service...")
+def load_rag_service():
+    """One RAGService (and one Chroma client / embedding model) shared across reruns and sessions."""
+    return get_rag_service()
+
+
+@st.cache_resource(show_spinner=False)
+def load_results_cache():
+    """Finished result lists keyed by normalized query, shared across reruns and sessions.
+
+    Plays the role of st.cache_data(ttl=900) on search, which cannot wrap the streamed search.
+    """
+    return QueryCache(max_size=256, ttl_seconds=900)
+
+
+def results_cache_key(query):
+    # Case and surrounding whitespace don't change the search (the service lowercases too)
+    return QueryCache.make_key(query.strip().lower())
+
+
+EXAMPLE_QUERIES = [
+    "Fintech co-founder with blockchain experience in London",
+    "Who is the seed stage founder in Berlin working on e-commerce?",
+    "Find a healthtech engineer who uses AI/ML for optimization",
+]
+
+
+# Answering the quick queries up front costs one Gemini call each on every process start, so by
+# default only the retrieval, re-ranking and record lookups behind them are warmed up
+PREFETCH_QUICK_QUERY_ANSWERS = os.getenv("PREFETCH_QUICK_QUERY_ANSWERS", "0") == "1"
+
+
+@st.cache_resource
+def prefetch_example_queries(_rag_service, _results_cache):
+    """Warms the service for the quick-query buttons once per process in a background thread.
+
+    With PREFETCH_QUICK_QUERY_ANSWERS=1 the full answers are computed too, so clicks hit the
+    results cache; repeat prefetches in later processes are served by the persistent LLM cache.
+    """
+    def run():
+        try:
+            if not PREFETCH_QUICK_QUERY_ANSWERS:
+                _rag_service.warm_up_queries(EXAMPLE_QUERIES)
+                return
+            for query, matches in zip(EXAMPLE_QUERIES, _rag_service.search_batch(EXAMPLE_QUERIES)):
+                _results_cache.put(results_cache_key(query), matches)
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Quick-query prefetch failed: {e}")
+
+    thread = threading.Thread(target=run, name="quick-query-prefetch", daemon=True)
+    thread.start()
+    return thread
     
 # --- Streamlit Configuration and Global Styling ---
 st.set_page_config(
@@ -44,14 +103,10 @@ st.markdown("""
 # --- HELPER FUNCTION: Callback for Quick Query Buttons (Sets State AND Updates Key) ---
 # ----------------------------------------------------------------------------------
 def set_query_value_and_key(query):
-    """Sets the query value in session state and updates the search input key."""
+    """Sets the query value in session state; the text input is keyed on it, so Streamlit
+    updates the same widget in place instead of remounting a new one."""
     st.session_state['query_input_value'] = query
     st.session_state['has_searched'] = False
-    
-    # CRITICAL FIX: Change the key of the text input. This forces Streamlit 
-    # to re-render the text input on the next rerun, guaranteeing it reads 
-    # the new value from session state. We use a simple counter for the key.
-    st.session_state['search_input_key_counter'] += 1 
 
 
 # ----------------------------------------------------------------------------------
@@ -73,17 +128,10 @@ def render_homepage_guide():
 
     st.subheader("💡 Try a Quick Query:")
     
-    # Define example queries
-    example_queries = [
-        "Fintech co-founder with blockchain experience in London",
-        "Who is the seed stage founder in Berlin working on e-commerce?",
-        "Find a healthtech engineer who uses AI/ML for optimization",
-    ]
-    
     # Use columns to lay out the buttons horizontally
-    cols = st.columns(len(example_queries))
+    cols = st.columns(len(EXAMPLE_QUERIES))
     
-    for i, query in enumerate(example_queries):
+    for i, query in enumerate(EXAMPLE_QUERIES):
         # Pass the query to the callback function
         cols[i].button(
             query, 
@@ -99,44 +147,36 @@ def render_result_card(match):
     """
     Renders a single match using ONLY native Streamlit components, 
     with maximized font sizes for better readability.
+
+    Consecutive text blocks are merged into one markdown element each, and the card uses no
+    st.columns layouts, since every element and container is a separate message to the browser.
     """
+    details = match['full_details']
     
     # FIX: Removed border=True argument to resolve TypeError
     with st.container(): 
         
-        # NOTE: Removed redundant st.columns([3, 1]) call here to keep code clean
-        
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            st.header(match['founder_name'])
-        with col2:
-            st.subheader(f":blue[{match['role']}]") 
-
-        st.markdown(f"##### **{match['company']}** • _{match['location']}_")
-        st.divider() 
+        # Name, role and company in one element instead of a two-column layout
+        st.markdown(
+            f"## {match['founder_name']} &nbsp;·&nbsp; :blue[{match['role']}]\n"
+            f"##### **{match['company']}** • _{match['location']}_\n\n---"
+        )
         
         st.info(f"**🎯 Match Reason:** {match['match_explanation']}")
 
-        st.subheader("💡 Idea")
-        st.markdown(f"#### {match['full_details']['idea']}") 
-        
-        st.markdown("---") 
-        
-        st.subheader("👤 About")
-        st.markdown(f"#### {match['full_details']['about']}")
+        st.markdown(
+            f"### 💡 Idea\n#### {details['idea']}\n\n---\n\n"
+            f"### 👤 About\n#### {details['about']}"
+        )
 
         with st.expander("📋 Show Full Details"):
-            colA, colB = st.columns(2)
-            
-            with colA:
-                st.markdown(f"**Keywords:** {match['full_details']['keywords']}")
-                st.markdown(f"**Stage:** {match['full_details']['stage']}")
+            st.markdown(
+                f"**Keywords:** {details['keywords']}  \n**Stage:** {details['stage']}  \n"
+                f"[🔗 LinkedIn Profile]({details['linked_in']})"
+            )
                 
-            with colB:
-                st.markdown(f"[🔗 LinkedIn Profile]({match['full_details']['linked_in']})")
-                
-            if match['full_details']['notes']:
-                st.success(f"**📝 Notes:** {match['full_details']['notes']}")
+            if details['notes']:
+                st.success(f"**📝 Notes:** {details['notes']}")
 
     st.markdown("##") 
 
@@ -144,32 +184,32 @@ def render_result_card(match):
 def main_streamlit_app():
     """Main function for the Streamlit application."""
 
-    # 1. Initialization and Guide
+    # 1. Guide first, then the service: on a cold start the page is already drawn while the
+    # embedding model and index load (cached afterwards, so later reruns return immediately)
     render_homepage_guide()
+    rag_service = load_rag_service()
 
     if not rag_service.is_initialized:
         st.error("⚠️ RAG Service initialization failed. Please check your configuration.")
         return
+    results_cache = load_results_cache()
+    prefetch_example_queries(rag_service, results_cache)
 
     # 2. Initialize necessary state variables
     if 'query_input_value' not in st.session_state:
         st.session_state['query_input_value'] = ""
-    if 'search_input_key_counter' not in st.session_state:
-        st.session_state['search_input_key_counter'] = 0
 
 
     # --- Search Interface ---
     col1, col2 = st.columns([5, 1])
     
     with col1:
-        # The text input's key is dynamic, forcing it to update on callback
+        # Bound to session state: the quick-query callback writes the key, the widget follows
         query = st.text_input(
             "Search",
-            value=st.session_state['query_input_value'], 
             placeholder="e.g., 'seed stage founder in AI/ML based in San Francisco'",
             label_visibility="collapsed",
-            # CRITICAL FIX: The key changes when the button callback runs
-            key=f"search_input_{st.session_state['search_input_key_counter']}"
+            key='query_input_value'
         )
     
     with col2:
@@ -181,19 +221,35 @@ def main_streamlit_app():
     # This logic remains robust: run if the button is clicked OR if the query value 
     # is different from the last successfully searched query.
     should_run_search = search_clicked or (st.session_state['query_input_value'] != st.session_state.get('last_query', '') and query)
+
+    # The results summary is filled in after the search, above cards streamed during it,
+    # so a finished search needs no second full-script rerun to redraw every card
+    results_header = st.container()
+    cards_rendered = False
     
     if should_run_search and query:
         
-        # 4. Finalize the state and run the search
-        st.session_state['query_input_value'] = query 
-            
+        # 4. Run the search
         with st.spinner(f"Searching for **{query}**..."):
             try:
-                # Calls the RAGService.search with the corrected filter logic
-                matches = rag_service.search(query) 
+                # Repeat searches (re-clicks, other sessions) skip the whole pipeline
+                cache_key = results_cache_key(query)
+                matches = results_cache.get(cache_key)
+                if matches is None:
+                    # Render each card as soon as the LLM finishes explaining it, instead of
+                    # waiting for the whole result list
+                    matches = []
+                    for match in rag_service.iter_search(query):
+                        matches.append(match)
+                        render_result_card(match)
+                    results_cache.put(cache_key, matches)
+                else:
+                    for match in matches:
+                        render_result_card(match)
+                cards_rendered = True
                 st.session_state['matches'] = matches
                 st.session_state['has_searched'] = True
-                st.session_state['last_query'] = query 
+                st.session_state['last_query'] = query
                 st.session_state['error'] = None
             except Exception as e:
                 st.session_state['error'] = str(e)
@@ -202,22 +258,24 @@ def main_streamlit_app():
     
     # --- Display Results ---
     if st.session_state.get('error'):
-        st.error(f"❌ **Error:** {st.session_state['error']}")
+        results_header.error(f"❌ **Error:** {st.session_state['error']}")
     
     elif st.session_state.get('has_searched'):
         matches = st.session_state.get('matches', [])
         query_text = st.session_state.get('last_query', '')
         
         if matches:
-            st.success(f"✅ **Found {len(matches)} match{'es' if len(matches) != 1 else ''} for \"{query_text}\"**")
-            
-            st.subheader(f"Top {len(matches)} Match{'es' if len(matches) != 1 else ''}")
-            st.divider()
+            with results_header:
+                st.success(f"✅ **Found {len(matches)} match{'es' if len(matches) != 1 else ''} for \"{query_text}\"**")
+                
+                st.subheader(f"Top {len(matches)} Match{'es' if len(matches) != 1 else ''}")
+                st.divider()
             
-            for match in matches:
-                render_result_card(match)
+            if not cards_rendered:
+                for match in matches:
+                    render_result_card(match)
         else:
-            st.warning(f"⚠️ No matches found for \"{query_text}\"")
+            results_header.warning(f"⚠️ No matches found for \"{query_text}\"")
     else:
         st.info("💡 Enter your detailed search query above or click a quick query to find founder matches.")
 
@@ -226,7 +284,4 @@ if __name__ == "__main__":
     if 'has_searched' not in st.session_state:
         st.session_state['has_searched'] = False
     
-    if rag_service:
-        main_streamlit_app()
-    else:
-        st.error("Failed to initialize RAG Service")
\ No newline at end of file
+    main_streamlit_app()
\ No newline at end of file
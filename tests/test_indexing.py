@@ -0,0 +1,32 @@
+# tests/test_indexing.py
+import os
+import sys
+
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+for module in ("torch", "sentence_transformers", "langchain_community"):
+    pytest.importorskip(module)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "function"))
+import indexing  # noqa: E402
+
+
+def _pragmas(conn):
+    return (
+        conn.execute("PRAGMA journal_mode").fetchone()[0],
+        conn.execute("PRAGMA synchronous").fetchone()[0],
+    )
+
+
+def test_relax_chroma_durability_changes_and_restores_pragmas(tmp_path):
+    client = chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+    conn = client._server._sysdb._conn_pool.connect()
+    before = _pragmas(conn)
+
+    restore = indexing.relax_chroma_durability(client)
+    assert _pragmas(conn) == ("off", 0)
+
+    client.get_or_create_collection("langchain").upsert(ids=["1"], embeddings=[[1.0, 0.0]])
+    restore()
+    assert _pragmas(conn) == before